@@ -68,6 +68,7 @@ Environment variables:
   CHUK_VIRTUAL_SHELL_PATH    Path to chuk_virtual_shell Python modules
   CHUK_VIRTUAL_SHELL_CONFIG  Path to configuration directory
   PYODIDE_SANDBOX            Name of the sandbox configuration to use
+  PYODIDE_DEBUG              Print full Python tracebacks on errors
   `);
 }
 
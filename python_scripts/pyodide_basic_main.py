@@ -7,6 +7,9 @@ import sys
 import os
 from chuk_virtual_shell.shell_interpreter import ShellInterpreter
 
+# Commands that leave the shell (compared case-insensitively)
+_EXIT_CMDS = frozenset(('exit', 'quit', 'q'))
+
 def pyodide_main():
     # Create shell with the specified sandbox configuration if provided
     sandbox_yaml = os.environ.get("PYODIDE_SANDBOX", "${options.defaultSandbox || 'ai_sandbox'}")
@@ -14,12 +17,16 @@ def pyodide_main():
     
     shell = ShellInterpreter(sandbox_yaml=sandbox_yaml)
     
-    print("=" * 60)
-    print("PyodideShell - Secure Virtual Environment")
-    print("=" * 60)
-    print("Type 'help' for a list of available commands.")
-    print("Type 'exit' to quit the shell.")
-    print("-" * 60)
+    # Write the banner in one go; each print is a separate stdout round trip
+    sys.stdout.write("\n".join([
+        "=" * 60,
+        "PyodideShell - Secure Virtual Environment",
+        "=" * 60,
+        "Type 'help' for a list of available commands.",
+        "Type 'exit' to quit the shell.",
+        "-" * 60,
+    ]) + "\n")
+    sys.stdout.flush()
     
     while shell.running:
         prompt = shell.prompt()
@@ -29,7 +36,7 @@ def pyodide_main():
                 continue
                 
             # Exit conditions
-            if cmd_line.lower() in {'exit', 'quit', 'q'}:
+            if len(cmd_line) <= 4 and cmd_line.lower() in _EXIT_CMDS:
                 break
                 
             result = shell.execute(cmd_line)
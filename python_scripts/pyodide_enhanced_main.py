@@ -8,207 +8,452 @@ This enhanced script provides:
 4. More detailed shell information
 """
 import sys
+import io
 import asyncio
 import os
+import itertools
+from collections import deque
+import importlib
 import importlib.util
+import traceback
 
 # Default sandbox configuration to use
 DEFAULT_SANDBOX = "${options.defaultSandbox || 'ai_sandbox'}"
 
+# Commands that leave the shell (compared case-insensitively)
+_EXIT_CMDS = frozenset(('exit', 'quit', 'q'))
+
+# Directories never worth descending into when dumping the tree for debugging
+PRUNED_DIRS = ('__pycache__', 'node_modules', 'site-packages')
+
+# Suffixes tried on the bare name, then directories searched for <name>.yaml,
+# by simple_find_config_file (directories keep their trailing slash so paths
+# are built by plain concatenation)
+_CONFIG_SUFFIXES = ("", ".yaml", ".yml")
+_CONFIG_DIRS = (
+    "./chuk_virtual_shell/config/",
+    "./chuk_virtual_shell/chuk_virtual_shell/config/",
+    "/home/pyodide/config/",
+)
+
+# Maximum number of directory entries shown in diagnostic listings
+LISTING_LIMIT = 50
+
+# How many directory levels find_module_file descends below its base
+MODULE_SEARCH_DEPTH = 4
+
+# Package loaded into the Pyodide filesystem by the host, and where it lives
+PACKAGE_NAME = "chuk_virtual_shell"
+PACKAGE_ROOT = "./chuk_virtual_shell"
+
+# (sandbox name,) -> (ShellInterpreter, sandbox_yaml) from earlier runs
+_RESOLVED = {}
+
+# Dotted module name -> (file path, is_package), filled by install_package_finder
+_KNOWN_PATHS = {}
+
+# Modules that may provide ShellInterpreter, in order of preference
+SHELL_INTERPRETER_CANDIDATES = (
+    # Nested module path (based on screenshot)
+    "chuk_virtual_shell.chuk_virtual_shell.shell_interpreter",
+    # Direct import path
+    "chuk_virtual_shell.shell_interpreter",
+    # Top-level shell_interpreter module
+    "shell_interpreter",
+)
+
+# Modules that may provide find_config_file, in order of preference
+CONFIG_LOADER_CANDIDATES = (
+    # Nested config directory as seen in screenshot
+    "chuk_virtual_shell.chuk_virtual_shell.config.sandbox_loader",
+    # Standard loader path
+    "chuk_virtual_shell.sandbox.loader.sandbox_config_loader",
+)
+
+# Sandbox name -> config path found by simple_find_config_file. As with
+# _FOUND_SPECS, misses are not kept so a config added later is still found.
+_FOUND_CONFIGS = {}
+
+# Module name -> spec for modules _cached_find_spec has located. Misses are
+# not kept, so a later start can find a package copied in after a failed one.
+_FOUND_SPECS = {}
+
+# nodepy.input, resolved on first use by safe_async_input
+_NODEPY_INPUT = None
+
+# Characters whose presence at either end of an input line means it needs stripping
+_WHITESPACE = ' \t\r\n\v\f'
+
 async def safe_async_input(prompt=""):
     """
     Async input gathering with improved handling
     """
+    global _NODEPY_INPUT
     try:
-        import nodepy
+        if _NODEPY_INPUT is None:
+            import nodepy
+            _NODEPY_INPUT = nodepy.input
         
         # Use await to ensure we get the full input
-        full_input = await nodepy.input(prompt)
+        full_input = await _NODEPY_INPUT(prompt)
         
-        # Additional handling for edge cases
-        return full_input.strip() if full_input is not None else ""
+        # Additional handling for edge cases; only strip (and allocate a
+        # new string) when there is surrounding whitespace to remove
+        if full_input is None:
+            return ""
+        if full_input and (full_input[0] in _WHITESPACE or full_input[-1] in _WHITESPACE):
+            return full_input.strip()
+        return full_input
     except Exception as e:
         print(f"Input error: {e}")
         return ""
 
-def find_module_file(base_dir, filename):
-    """Search recursively for a file in the directory structure"""
-    for root, dirs, files in os.walk(base_dir):
-        if filename in files:
-            return os.path.join(root, filename)
-    return None
+def _cached_find_spec(name):
+    """Memoized importlib.util.find_spec that returns None instead of raising"""
+    spec = _FOUND_SPECS.get(name)
+    if spec is None:
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            # Raised when a parent package is missing or the name is invalid
+            return None
+        if spec is not None:
+            _FOUND_SPECS[name] = spec
+    return spec
 
-async def run_pyodide_shell():
+def import_from(module_name, attr):
     """
-    Async shell main loop with YAML sandbox configuration
+    Import attr from module_name, loading it from the cached find_spec
+    result so a module is only located once and a missing module never
+    triggers a full import attempt
     """
-    try:
-        # First, verify we can import the required modules
-        print("Checking for required modules...")
-        
-        # List all files in the current directory
-        print("Files in current directory:")
-        print(os.listdir('.'))
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = _cached_find_spec(module_name)
+        if spec is None:
+            raise ImportError(f"No module named '{module_name}'")
+        if spec.loader is None:
+            # Namespace package; nothing to execute
+            return getattr(importlib.import_module(module_name), attr)
         
-        # Check if we can find the module
-        module_names = ['chuk_virtual_shell', 'shell_interpreter']
-        for module_name in module_names:
-            spec = importlib.util.find_spec(module_name)
-            if spec:
-                print(f"Found module {module_name} at {spec.origin}")
-            else:
-                print(f"Module {module_name} not found")
-                
-        # Print sys.path
-        print("Python module search path (sys.path):")
-        for p in sys.path:
-            print(f"  - {p}")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            sys.modules.pop(module_name, None)
+            raise
+        module = sys.modules[module_name]
         
-        # Based on the file structure, let's try importing shell_interpreter 
-        # from the nested chuk_virtual_shell directory
-        ShellInterpreter = None
+        # Bind the submodule on its parent package, as the import system does
+        parent, _, child = module_name.rpartition('.')
+        if parent in sys.modules:
+            setattr(sys.modules[parent], child, module)
+    return getattr(module, attr)
+
+def simple_find_config_file(name):
+    """Simplified config file finder when the module can't be imported"""
+    config_path = _FOUND_CONFIGS.get(name)
+    if config_path is not None:
+        return config_path
+    
+    yaml_name = name + ".yaml"
+    candidates = itertools.chain(
+        (name + suffix for suffix in _CONFIG_SUFFIXES),
+        (directory + yaml_name for directory in _CONFIG_DIRS))
+    for config_path in candidates:
+        if os.path.exists(config_path):
+            _FOUND_CONFIGS[name] = config_path
+            return config_path
+    
+    return None
+
+class _CVSFinder:
+    """
+    Meta path finder resolving chuk_virtual_shell modules from a prebuilt
+    index, so imports skip the per-entry sys.path scan
+    """
+    def find_spec(self, name, path, target=None):
+        if name != PACKAGE_NAME and not name.startswith(PACKAGE_NAME + '.'):
+            return None
+        known = _KNOWN_PATHS.get(name)
+        if known is None:
+            # Not indexed; let the regular finders handle it
+            return None
+        location, is_package = known
+        if is_package:
+            return importlib.util.spec_from_file_location(
+                name, location, submodule_search_locations=[os.path.dirname(location)])
+        return importlib.util.spec_from_file_location(name, location)
+
+def index_package(root, package):
+    """Map every module below root to its file, in a single scandir pass per directory"""
+    known = {}
+    stack = [(root, package)]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith('.') and entry.name != '__pycache__':
+                        stack.append((entry.path, f"{prefix}.{entry.name}"))
+                elif entry.name.endswith('.py') and entry.is_file():
+                    location = os.path.abspath(entry.path)
+                    if entry.name == '__init__.py':
+                        known[prefix] = (location, True)
+                    else:
+                        known[f"{prefix}.{entry.name[:-3]}"] = (location, False)
+    return known
+
+def install_package_finder(root=PACKAGE_ROOT):
+    """Index the package once and put _CVSFinder at the front of sys.meta_path"""
+    if any(isinstance(finder, _CVSFinder) for finder in sys.meta_path):
+        return
+    if not os.path.isdir(root):
+        return
+    _KNOWN_PATHS.update(index_package(root, PACKAGE_NAME))
+    sys.meta_path.insert(0, _CVSFinder())
+
+def list_dir(path, limit=LISTING_LIMIT):
+    """Return up to limit entry names of path without materializing the whole directory"""
+    with os.scandir(path) as it:
+        return [entry.name for entry in itertools.islice(it, limit)]
+
+def iter_files(base_dir):
+    """
+    Yield a DirEntry for every file below base_dir, using os.scandir.
+    Hidden directories and PRUNED_DIRS are skipped.
+    """
+    stack = [base_dir]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name.startswith('.') or entry.name in PRUNED_DIRS:
+                        continue
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry
+
+def find_module_file(base_dir, filename, max_depth=MODULE_SEARCH_DEPTH):
+    """
+    Breadth-first search for a file in the directory structure. Below
+    base_dir, only Python packages (directories with an __init__.py)
+    have their subdirectories searched, at most max_depth levels deep.
+    """
+    queue = deque([(base_dir, 0)])
+    while queue:
+        directory, depth = queue.popleft()
+        subdirs = []
+        is_package = False
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name == filename and entry.is_file():
+                        return entry.path
+                    elif entry.name == '__init__.py':
+                        is_package = True
+        except OSError:
+            continue
         
-        # Try all possible import paths based on your file structure
-        import_attempts = [
-            # Nested module path (based on screenshot)
-            lambda: __import__('chuk_virtual_shell.chuk_virtual_shell.shell_interpreter', 
-                              fromlist=['ShellInterpreter']).ShellInterpreter,
-            # Direct import path
-            lambda: __import__('chuk_virtual_shell.shell_interpreter', 
-                              fromlist=['ShellInterpreter']).ShellInterpreter,
-            # Try from the nested directory directly
-            lambda: __import__('./chuk_virtual_shell/chuk_virtual_shell/shell_interpreter', 
-                              fromlist=['ShellInterpreter']).ShellInterpreter,
-            # Try path with direct shell_interpreter file
-            lambda: __import__('shell_interpreter', 
-                              fromlist=['ShellInterpreter']).ShellInterpreter
-        ]
+        if depth < max_depth and (depth == 0 or is_package):
+            queue.extend((subdir, depth + 1) for subdir in subdirs)
+    return None
+
+def resolve_shell(sandbox_name):
+    """
+    Import ShellInterpreter and locate the sandbox configuration.
+    Returns a (ShellInterpreter, sandbox_yaml) pair.
+    """
+    # First, verify we can import the required modules
+    print("Checking for required modules...")
+    
+    # List all files in the current directory
+    print("Files in current directory:")
+    print(list_dir('.'))
+    
+    # Check if we can find the modules; the specs are cached and reused
+    # by import_from below rather than searching sys.path again
+    module_names = (PACKAGE_NAME,) + SHELL_INTERPRETER_CANDIDATES
+    for module_name in module_names:
+        spec = _cached_find_spec(module_name)
+        if spec:
+            print(f"Found module {module_name} at {spec.origin}")
+        else:
+            print(f"Module {module_name} not found")
+            
+    # Print sys.path in a single write
+    sys.stdout.write("Python module search path (sys.path):\n  - " + "\n  - ".join(sys.path) + "\n")
+    sys.stdout.flush()
+    
+    # Based on the file structure, let's try importing shell_interpreter 
+    # from the nested chuk_virtual_shell directory
+    ShellInterpreter = None
+    
+    # Try each candidate module; only one with a spec gets executed
+    for i, module_name in enumerate(SHELL_INTERPRETER_CANDIDATES):
+        try:
+            print(f"Import attempt {i+1} ({module_name})...")
+            ShellInterpreter = import_from(module_name, 'ShellInterpreter')
+            print(f"Success! Imported ShellInterpreter with attempt {i+1}")
+            break
+        except ImportError as e:
+            print(f"Import attempt {i+1} failed: {e}")
+    
+    # If still not imported, try file-based import
+    if ShellInterpreter is None:
+        print("Trying file-based import...")
         
-        # Try each import strategy
-        for i, import_attempt in enumerate(import_attempts):
+        # Look for shell_interpreter.py file
+        shell_interpreter_path = None
+        for base_dir in ['.', './chuk_virtual_shell']:
+            if not os.path.exists(base_dir):
+                continue
+                
+            shell_interpreter_path = find_module_file(base_dir, 'shell_interpreter.py')
+            if shell_interpreter_path:
+                break
+                
+        if shell_interpreter_path:
+            print(f"Found shell_interpreter.py at {shell_interpreter_path}")
+            
+            # Import from file
+            spec = importlib.util.spec_from_file_location(
+                "shell_interpreter", shell_interpreter_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            ShellInterpreter = module.ShellInterpreter
+            print("Successfully imported ShellInterpreter from file")
+        else:
+            raise ImportError("Could not find shell_interpreter.py in any directory")
+    
+    # Try to find the sandbox configuration loader
+    find_config_file = None
+    try:
+        # Try to import the config file finder
+        for i, module_name in enumerate(CONFIG_LOADER_CANDIDATES):
             try:
-                print(f"Import attempt {i+1}...")
-                ShellInterpreter = import_attempt()
-                print(f"Success! Imported ShellInterpreter with attempt {i+1}")
+                print(f"Config loader import attempt {i+1} ({module_name})...")
+                find_config_file = import_from(module_name, 'find_config_file')
+                print(f"Success! Imported find_config_file with attempt {i+1}")
                 break
             except ImportError as e:
-                print(f"Import attempt {i+1} failed: {e}")
+                print(f"Config loader import attempt {i+1} failed: {e}")
+    except Exception as e:
+        print(f"Error importing sandbox loader: {e}")
         
-        # If still not imported, try file-based import
-        if ShellInterpreter is None:
-            print("Trying file-based import...")
-            
-            # Look for shell_interpreter.py file
-            shell_interpreter_path = None
-            for base_dir in ['.', './chuk_virtual_shell']:
-                if not os.path.exists(base_dir):
-                    continue
-                    
-                shell_interpreter_path = find_module_file(base_dir, 'shell_interpreter.py')
-                if shell_interpreter_path:
-                    print(f"Found shell_interpreter.py at {shell_interpreter_path}")
-                    break
-            
-            if shell_interpreter_path:
-                # Import from file
-                spec = importlib.util.spec_from_file_location(
-                    "shell_interpreter", shell_interpreter_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                ShellInterpreter = module.ShellInterpreter
-                print("Successfully imported ShellInterpreter from file")
+    # Fall back to the simplified finder if import fails
+    if find_config_file is None:
+        def find_config_file(name):
+            print(f"Using simplified config file finder for {name}")
+            config_path = simple_find_config_file(name)
+            if config_path:
+                print(f"Found config at {config_path}")
+            return config_path
+
+    sandbox_yaml = sandbox_name
+    
+    # If sandbox specified by name, try to find its config file.
+    if not sandbox_yaml.endswith(('.yaml', '.yml')) and '/' not in sandbox_yaml:
+        config_path = find_config_file(sandbox_yaml)
+        if config_path:
+            sandbox_yaml = config_path
+        else:
+            print(f"Warning: Sandbox configuration '{sandbox_yaml}' not found, falling back to default")
+            # Try to find the default sandbox.
+            default_path = find_config_file(DEFAULT_SANDBOX)
+            if default_path:
+                sandbox_yaml = default_path
             else:
-                raise ImportError("Could not find shell_interpreter.py in any directory")
-        
-        # Try to find the sandbox configuration loader
-        find_config_file = None
-        try:
-            # Try to import the config file finder
-            import_attempts = [
-                # Try nested config directory as seen in screenshot
-                lambda: __import__('chuk_virtual_shell.chuk_virtual_shell.config.sandbox_loader', 
-                                  fromlist=['find_config_file']).find_config_file,
-                # Try standard loader path
-                lambda: __import__('chuk_virtual_shell.sandbox.loader.sandbox_config_loader', 
-                                  fromlist=['find_config_file']).find_config_file
-            ]
-            
-            for i, import_attempt in enumerate(import_attempts):
-                try:
-                    print(f"Config loader import attempt {i+1}...")
-                    find_config_file = import_attempt()
-                    print(f"Success! Imported find_config_file with attempt {i+1}")
-                    break
-                except ImportError as e:
-                    print(f"Config loader import attempt {i+1} failed: {e}")
-        except Exception as e:
-            print(f"Error importing sandbox loader: {e}")
-            
-        # Create a fallback function if import fails
-        if find_config_file is None:
-            def find_config_file(name):
-                """Simplified config file finder when the module can't be imported"""
-                print(f"Using simplified config file finder for {name}")
-                
-                # Check for the config file in various locations
-                config_paths = [
-                    f"{name}",
-                    f"{name}.yaml",
-                    f"{name}.yml",
-                    f"./chuk_virtual_shell/config/{name}.yaml",
-                    f"./chuk_virtual_shell/chuk_virtual_shell/config/{name}.yaml",
-                    f"/home/pyodide/config/{name}.yaml"
-                ]
-                
-                for config_path in config_paths:
-                    if os.path.exists(config_path):
-                        print(f"Found config at {config_path}")
-                        return config_path
-                
-                return None
+                sandbox_yaml = None
+    
+    return ShellInterpreter, sandbox_yaml
+
+def install_line_buffered_stdout():
+    """
+    Replace sys.stdout with a line-buffered wrapper over the same buffer,
+    so partial writes are batched until a newline rather than handed to
+    the host one by one. Returns a (previous, wrapper) pair, or None if
+    sys.stdout was left alone.
+    """
+    stream = sys.stdout
+    if not hasattr(stream, 'buffer') or getattr(stream, 'line_buffering', False):
+        return None
+    stream.flush()
+    wrapper = io.TextIOWrapper(
+        stream.buffer, encoding='utf-8', line_buffering=True, write_through=False)
+    sys.stdout = wrapper
+    return stream, wrapper
+
+def restore_stdout(installed):
+    """Undo install_line_buffered_stdout without closing the shared buffer"""
+    if installed is None:
+        return
+    previous, wrapper = installed
+    # Detach only our own wrapper; dropping it would close the shared buffer
+    wrapper.detach()
+    # Leave sys.stdout alone if something else replaced it during the session
+    if sys.stdout is wrapper:
+        sys.stdout = previous
 
+async def run_pyodide_shell():
+    """
+    Async shell main loop with YAML sandbox configuration
+    """
+    installed_stdout = install_line_buffered_stdout()
+    try:
         # Check for environment variables that might specify a sandbox.
-        sandbox_yaml = os.environ.get("PYODIDE_SANDBOX", DEFAULT_SANDBOX)
+        sandbox_name = os.environ.get("PYODIDE_SANDBOX", DEFAULT_SANDBOX)
+        
+        # Resolve the interpreter and sandbox config once per sandbox; a
+        # re-entered shell reuses them instead of repeating the import work.
+        key = (sandbox_name,)
+        cached = _RESOLVED.get(key)
+        if cached:
+            ShellInterpreter, sandbox_yaml = cached
+        else:
+            ShellInterpreter, sandbox_yaml = resolve_shell(sandbox_name)
+            _RESOLVED[key] = (ShellInterpreter, sandbox_yaml)
         
-        # If sandbox specified by name, try to find its config file.
-        if not sandbox_yaml.endswith(('.yaml', '.yml')) and '/' not in sandbox_yaml:
-            config_path = find_config_file(sandbox_yaml)
-            if config_path:
-                sandbox_yaml = config_path
-            else:
-                print(f"Warning: Sandbox configuration '{sandbox_yaml}' not found, falling back to default")
-                # Try to find the default sandbox.
-                default_path = find_config_file(DEFAULT_SANDBOX)
-                if default_path:
-                    sandbox_yaml = default_path
-                else:
-                    sandbox_yaml = None
-                    
         print(f"Initializing shell with sandbox configuration: {sandbox_yaml or 'default'}")
         
         # Create shell with the specified sandbox configuration.
         shell = ShellInterpreter(sandbox_yaml=sandbox_yaml)
         
-        # Print sandbox info.
-        print("Shell initialized with the following environment:")
-        print(f"Home directory: {shell.environ.get('HOME', '/home/user')}")
-        print(f"User: {shell.environ.get('USER', 'user')}")
-        
-        # Welcome message.
+        # Print sandbox info and welcome message in a single write.
+        env = shell.environ
         fs_info = shell.fs.get_fs_info()
+        security_line = ""
         if "security" in fs_info:
-            security = fs_info["security"]
-            read_only = security.get("read_only", False)
-            print(f"Security mode: {'Read-only' if read_only else 'Restricted write'}")
-        
-        print("\nType 'help' for a list of available commands.")
-        print("Type 'exit' to quit the shell.")
-        print("-" * 60)
+            read_only = fs_info["security"].get("read_only", False)
+            security_line = f"Security mode: {'Read-only' if read_only else 'Restricted write'}\n"
+        sys.stdout.write(
+            "Shell initialized with the following environment:\n"
+            f"Home directory: {env.get('HOME', '/home/user')}\n"
+            f"User: {env.get('USER', 'user')}\n"
+            f"{security_line}"
+            "\nType 'help' for a list of available commands.\n"
+            "Type 'exit' to quit the shell.\n"
+            f"{'-' * 60}\n"
+        )
 
+        # Newline-terminated writes are flushed by line buffering alone.
         while shell.running:
             # Prepare prompt.
             prompt = shell.prompt()
             sys.stdout.write(prompt)
+            # The prompt has no newline and nodepy.input does not echo it,
+            # so line buffering alone would hold it back.
             sys.stdout.flush()
 
             try:
@@ -216,7 +461,7 @@ async def run_pyodide_shell():
                 cmd_line = await safe_async_input("")
                 
                 # Exit conditions.
-                if cmd_line.lower() in {'exit', 'quit', 'q'}:
+                if len(cmd_line) <= 4 and cmd_line.lower() in _EXIT_CMDS:
                     break
                 
                 # Skip empty lines.
@@ -226,7 +471,7 @@ async def run_pyodide_shell():
                 # Execute command.
                 result = shell.execute(cmd_line)
                 if result:
-                    print(result)
+                    sys.stdout.write(f"{result}\n")
             
             except KeyboardInterrupt:
                 print("^C")
@@ -245,62 +490,74 @@ async def run_pyodide_shell():
             if os.path.exists(dirname):
                 print(f"{dirname} directory exists")
                 print("Contents:")
-                print(os.listdir(dirname))
+                print(list_dir(dirname))
                 
                 # Print nested contents for directories
                 if dirname == './chuk_virtual_shell':
                     nested = os.path.join(dirname, 'chuk_virtual_shell')
                     if os.path.exists(nested) and os.path.isdir(nested):
                         print(f"Contents of {nested}:")
-                        print(os.listdir(nested))
+                        print(list_dir(nested))
             else:
                 print(f"{dirname} directory doesn't exist")
                 
         # Search for all Python files to help with debugging
         print("Searching for Python files...")
         all_py_files = []
-        for root, dirs, files in os.walk('.'):
-            for file in files:
-                if file.endswith('.py'):
-                    all_py_files.append(os.path.join(root, file))
+        for entry in iter_files('.'):
+            if entry.name.endswith('.py'):
+                all_py_files.append(entry.path)
+                # Stop at the first 10 to avoid flooding (and walking the whole tree)
+                if len(all_py_files) >= 10:
+                    break
         
-        print(f"Found {len(all_py_files)} Python files:")
-        for py_file in all_py_files[:10]:  # Show first 10 to avoid flooding
-            print(f"  - {py_file}")
+        sys.stdout.write("".join(
+            [f"Found {len(all_py_files)} Python files (showing at most 10):\n"]
+            + [f"  - {py_file}\n" for py_file in all_py_files]))
+        sys.stdout.flush()
     except Exception as e:
-        print(f"Shell error: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"Shell error: {e!r}")
+        # Formatting the full stack is slow under Pyodide; only on request
+        if os.environ.get("PYODIDE_DEBUG"):
+            traceback.print_exc()
     finally:
         print("PyodideShell session ended.")
+        restore_stdout(installed_stdout)
 
 def pyodide_main():
     """
     Robust entry point for Pyodide shell
     """
     try:
-        # Print startup banner.
-        print("=" * 60)
-        print("PyodideShell - Secure Virtual Environment")
-        print("=" * 60)
+        # Print startup banner in a single write.
+        sys.stdout.write("\n".join([
+            "=" * 60,
+            "PyodideShell - Secure Virtual Environment",
+            "=" * 60,
+        ]) + "\n")
+        sys.stdout.flush()
         
-        # Create an async main function.
-        async def main():
-            await run_pyodide_shell()
+        # Resolve chuk_virtual_shell imports from a prebuilt index.
+        install_package_finder()
         
-        # Get or create event loop.
+        # Pyodide already runs an event loop, so schedule the shell on it;
+        # otherwise (e.g. plain CPython) run it to completion.
         try:
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
         except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-        loop.run_until_complete(main())
+            loop = None
+        
+        # Outside the handler, so the shell does not run while the
+        # "no running event loop" error is still being handled.
+        if loop is None:
+            asyncio.run(run_pyodide_shell())
+        else:
+            return loop.create_task(run_pyodide_shell())
     
     except Exception as main_error:
-        print(f"Fatal error: {main_error}")
-        import traceback
-        traceback.print_exc()
+        print(f"Fatal error: {main_error!r}")
+        if os.environ.get("PYODIDE_DEBUG"):
+            traceback.print_exc()
 
 if __name__ == "__main__":
     pyodide_main()
\ No newline at end of file
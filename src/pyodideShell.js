@@ -178,6 +178,14 @@ async function loadConfiguration(pyodide, options = {}) {
       print(f"Using sandbox configuration: {os.environ['PYODIDE_SANDBOX']}")
     `);
   }
+
+  // Forward the debug flag so the Python scripts print full tracebacks.
+  if (process.env.PYODIDE_DEBUG) {
+    await pyodide.runPythonAsync(`
+      import os
+      os.environ['PYODIDE_DEBUG'] = ${JSON.stringify(process.env.PYODIDE_DEBUG)}
+    `);
+  }
 }
 
 /**